@@ -1,15 +1,31 @@
 # main.py
 from __future__ import annotations
 
-import io
+import asyncio
+import hashlib
+import multiprocessing
 import os
+import string
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Optional
 
 from fastapi import FastAPI, File, Form, UploadFile, Request
-from fastapi.responses import JSONResponse, HTMLResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from services.text_extraction import extract_text_from_bytes
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+except ImportError:  # keyword-overlap fallback is used instead
+    TfidfVectorizer = None
+
 # ---------------------- Optional project helpers ----------------------
 def _safe_imports():
     mods = {}
@@ -32,50 +48,149 @@ def _safe_imports():
 
 mods = _safe_imports()
 
+# Keyword fallback tokenizer: every byte except [a-z0-9+#.] becomes a space, so
+# tokenizing is a C-level translate + split instead of a regex pass, with the same
+# splits as [^a-zA-Z0-9+#.]+ on lowercased text. Non-ASCII bytes (NBSP, bullets,
+# dashes, accents) separate tokens just as they did with the regex. Works on UTF-8
+# bytes because str.translate loses its ASCII fast path on any non-ASCII char.
+_TOKEN_CHARS = set(string.ascii_lowercase + string.digits + "+#.")
+_XLATE = bytes(b if chr(b) in _TOKEN_CHARS else 0x20 for b in range(256))
+
+def _tokenize(text_l: str) -> List[bytes]:
+    """Split already-lowercased text into fallback-scorer tokens (as UTF-8 bytes)."""
+    return text_l.encode().translate(_XLATE).split()
+
+class _LRUCache:
+    """Small bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+# Extracted text keyed by (extension, content hash) so re-uploads skip parsing
+_TEXT_CACHE = _LRUCache(256)
+
 # ---------------------- Utilities (with fallbacks) ----------------------
-def extract_text_from_upload(file: UploadFile) -> str:
+# Upload limits, enforced from UploadFile.size before any parsing happens
+MAX_BYTES = int(os.getenv("MAX_RESUME_BYTES", 5 * 1024 * 1024))
+MAX_TOTAL_BYTES = int(os.getenv("MAX_UPLOAD_TOTAL_BYTES", 30 * 1024 * 1024))
+
+def check_upload_sizes(files: List[UploadFile]) -> Optional[ORJSONResponse]:
+    """Return a 413 response if any file, or the batch as a whole, is over the limit."""
+    sizes = [f.size or 0 for f in files]
+    if any(size > MAX_BYTES for size in sizes):
+        return ORJSONResponse({"detail": f"File too large (max {round(MAX_BYTES / (1024 * 1024), 1):g} MB per file)."}, status_code=413)
+    if sum(sizes) > MAX_TOTAL_BYTES:
+        return ORJSONResponse({"detail": f"Upload too large (max {round(MAX_TOTAL_BYTES / (1024 * 1024), 1):g} MB in total)."}, status_code=413)
+    return None
+
+async def extract_text_from_upload(file: UploadFile) -> str:
     dp = mods.get("document_processor")
     if dp and hasattr(dp, "extract_text_from_file"):
         try:
-            return dp.extract_text_from_file(file)  # type: ignore[attr-defined]
+            return await asyncio.to_thread(dp.extract_text_from_file, file)  # type: ignore[attr-defined]
         except Exception:
             pass
 
-    name = (file.filename or "").lower()
-    content = file.file.read()
-    file.file.seek(0)
+    filename = file.filename or ""
+    content = await file.read()
+    return await _extract_content(filename, content, _content_key(filename, content))
 
-    if name.endswith(".pdf"):
-        try:
-            from PyPDF2 import PdfReader  # type: ignore
-            reader = PdfReader(io.BytesIO(content))
-            parts = [(p.extract_text() or "") for p in reader.pages]
-            return "\n".join(parts).strip()
-        except Exception:
-            return ""
-    if name.endswith(".docx"):
-        try:
-            import docx  # python-docx
-            doc = docx.Document(io.BytesIO(content))
-            return "\n".join(p.text for p in doc.paragraphs).strip()
-        except Exception:
-            return ""
-    if name.endswith(".txt"):
+
+def _content_key(filename: str, content: bytes) -> tuple[str, str]:
+    return (os.path.splitext(filename.lower())[1], hashlib.blake2b(content, digest_size=16).hexdigest())
+
+
+async def _extract_content(filename: str, content: bytes, key: tuple[str, str]) -> str:
+    text = _TEXT_CACHE.get(key)
+    if text is not None:
+        return text
+
+    loop = asyncio.get_running_loop()
+    pool = _POOL
+    try:
+        text = await loop.run_in_executor(pool, extract_text_from_bytes, filename, content)
+    except BrokenProcessPool:
+        # A parser process died (e.g. MuPDF crashed on a hostile PDF). That fails
+        # every future in flight on the pool, not just the culprit's, so swap in a
+        # fresh pool and retry this file alone in a one-off process: if that one
+        # dies too, the file itself is at fault and caching "" is safe.
+        _replace_pool(pool)
+        solo = _make_pool(max_workers=1)
         try:
-            return content.decode("utf-8", errors="ignore")
-        except Exception:
-            return ""
-    return content.decode("utf-8", errors="ignore")
+            text = await loop.run_in_executor(solo, extract_text_from_bytes, filename, content)
+        except BrokenProcessPool:
+            text = ""
+        finally:
+            solo.shutdown(wait=False)
+    _TEXT_CACHE.put(key, text)
+    return text
+
+
+async def extract_texts_from_uploads(files: List[UploadFile]) -> List[str]:
+    """Extract every upload concurrently; PDF/DOCX parsing runs in the worker pool."""
+    dp = mods.get("document_processor")
+    if dp and hasattr(dp, "extract_text_from_file"):
+        return list(await asyncio.gather(*(extract_text_from_upload(f) for f in files)))
+
+    # Identical files in one batch (e.g. sent under both 'resumes' and 'files')
+    # are parsed once; concurrent parses would all miss _TEXT_CACHE otherwise
+    keys = []
+    unique = {}
+    for f in files:
+        filename = f.filename or ""
+        content = await f.read()
+        key = _content_key(filename, content)
+        keys.append(key)
+        unique.setdefault(key, (filename, content))
 
+    texts = await asyncio.gather(*(_extract_content(name, data, key) for key, (name, data) in unique.items()))
+    by_key = dict(zip(unique, texts))
+    return [by_key[key] for key in keys]
 
-def generate_job_description(payload: dict) -> str:
+
+async def generate_job_description(payload: dict) -> str:
     ai = mods.get("ai_service")
-    if ai and hasattr(ai, "generate_job_description"):
+    if ai and hasattr(ai, "generate_job_description_async"):
+        try:
+            return await ai.generate_job_description_async(payload)  # type: ignore[attr-defined]
+        except Exception:
+            pass
+    elif ai and hasattr(ai, "generate_job_description"):
         try:
-            return ai.generate_job_description(payload)  # type: ignore[attr-defined]
+            return await asyncio.to_thread(ai.generate_job_description, payload)  # type: ignore[attr-defined]
         except Exception:
             pass
 
+    # Value types are part of the key: 3, 3.0 and True hash equal but render differently.
+    # Lists (e.g. must_have_skills sent as an array) are keyed as tuples.
+    items = tuple(
+        (k, type(v).__name__, tuple(v) if isinstance(v, list) else v)
+        for k, v in sorted(payload.items())
+    )
+    try:
+        hash(items)
+    except TypeError:  # still unhashable (nested dicts/lists): render without caching
+        return _fallback_jd.__wrapped__(items)
+    return _fallback_jd(items)
+
+
+@lru_cache(maxsize=128)
+def _fallback_jd(items: tuple) -> str:
+    """Template JD used when ai_service is unavailable; cached per payload."""
+    payload = {k: v for k, _, v in items}
     title = payload.get("title") or "Role"
     yoe = payload.get("years_of_experience") or "2+"
     skills = payload.get("must_have_skills") or ""
@@ -84,7 +199,9 @@ def generate_job_description(payload: dict) -> str:
     industry = payload.get("industry") or "General"
     location = payload.get("location") or "Remote"
 
-    skills_list = [s.strip() for s in skills.split(",") if s.strip()]
+    if not isinstance(skills, (list, tuple)):
+        skills = str(skills).split(",")
+    skills_list = [str(s).strip() for s in skills if str(s).strip()]
     lines = [
         f"**{title}**", "",
         f"**Company:** {company}",
@@ -111,6 +228,60 @@ def generate_job_description(payload: dict) -> str:
     return "\n".join(lines)
 
 
+def _tfidf_scores(jd_text: str, resume_blobs: List[tuple[str, str]]):
+    """IDF-weighted share of JD terms found in each resume, in one sparse product.
+
+    Returns [(score, missing_terms), ...] in resume order, or None when
+    scikit-learn is unavailable or the texts have no usable vocabulary.
+    """
+    if TfidfVectorizer is None or not resume_blobs:
+        return None
+    vec = TfidfVectorizer(
+        token_pattern=r"[A-Za-z0-9+#][A-Za-z0-9+#.]*[A-Za-z0-9+#]",
+        lowercase=True,
+        stop_words="english",
+    )
+    try:
+        mat = vec.fit_transform([jd_text] + [t for _, t in resume_blobs])
+    except ValueError:  # empty vocabulary
+        return None
+    jd_vec = mat[0].toarray().ravel()
+    total = jd_vec.sum() or 1.0
+    present = mat[1:] > 0
+    coverage = (present @ jd_vec) / total
+
+    # Missing terms, heaviest JD terms first
+    vocab = vec.get_feature_names_out()
+    jd_order = [j for j in jd_vec.argsort()[::-1] if jd_vec[j] > 0]
+    results = []
+    for i, cov in enumerate(coverage):
+        row = present.getrow(i)
+        have = set(row.indices)
+        missing = [str(vocab[j]) for j in jd_order if j not in have][:8]
+        results.append((int(round(min(1.0, cov) * 100)), missing))
+    return results
+
+
+def _overlap_scores(jd_text: str, resume_blobs: List[tuple[str, str]]):
+    """Keyword-overlap scoring used when TF-IDF is unavailable."""
+    # JD side is computed once per request, not per resume
+    jd_tokens = {t for t in _tokenize(jd_text.lower()) if len(t) > 1}
+    skills = {t.decode() for t in jd_tokens}
+    denom = max(len(jd_tokens), 1)
+
+    results = []
+    for _, text in resume_blobs:
+        text_l = text.lower()
+        # jd_tokens only holds tokens longer than one char, so the resume tokens need no
+        # filtering; set.intersection/difference take the lists as-is and do the
+        # whole comparison in C without building a per-resume set
+        overlap = len(jd_tokens.intersection(_tokenize(text_l)))
+        sc = int(min(100, round((overlap / denom) * 100)))
+        missing = list(skills.difference(text_l.split()))[:8]
+        results.append((sc, missing))
+    return results
+
+
 def score_candidates(jd_text: str, resume_blobs: List[tuple[str, str]]):
     cm = mods.get("candidate_matcher")
     if cm and hasattr(cm, "match_candidates"):
@@ -122,27 +293,12 @@ def score_candidates(jd_text: str, resume_blobs: List[tuple[str, str]]):
         candidates = None
 
     if candidates is None:
-        import re
-        skills = set(
-            s.lower().strip()
-            for s in re.split(r"[^a-zA-Z0-9\+\#\.]+", jd_text)
-            if len(s.strip()) > 1
-        )
-
-        def score_one(text: str) -> int:
-            words = set(
-                s.lower().strip()
-                for s in re.split(r"[^a-zA-Z0-9\+\#\.]+", text)
-                if len(s.strip()) > 1
-            )
-            overlap = len(skills & words)
-            denom = max(len(skills), 1)
-            return int(min(100, round((overlap / denom) * 100)))
+        scored = _tfidf_scores(jd_text, resume_blobs)
+        if scored is None:
+            scored = _overlap_scores(jd_text, resume_blobs)
 
         fallback = []
-        for name, text in resume_blobs:
-            sc = score_one(text)
-            missing = list((skills - set(text.lower().split())))[:8]
+        for (name, _), (sc, missing) in zip(resume_blobs, scored):
             if sc >= 80:
                 remark = "Strong alignment with required terminology."
             elif sc >= 60:
@@ -179,14 +335,104 @@ def score_candidates(jd_text: str, resume_blobs: List[tuple[str, str]]):
     rejections = [{"name": c["name"], "email": rejection_email(c["name"])} for c in candidates[1:]]
     return candidates, interview, rejections
 
+# Upper bound on how long the results page waits for AI-written emails
+EMAIL_TIMEOUT = float(os.getenv("EMAIL_TIMEOUT", "30"))
+
+async def draft_emails(jd_text: str, candidates: List[dict], interview: str, rejections: List[dict]):
+    """Replace the templated emails with Claude-written ones when ai_service is available.
+
+    All emails are requested concurrently. Any email that fails or is not back within
+    EMAIL_TIMEOUT keeps its templated version; the others still use Claude's text.
+    """
+    ai = mods.get("ai_service")
+    if not (ai and hasattr(ai, "generate_rejection_email_async") and candidates):
+        return interview, rejections
+
+    names = [c["name"] for c in candidates]
+    display = [n.rsplit('.', 1)[0].replace('_', ' ') for n in names]
+    tasks = [asyncio.ensure_future(ai.generate_interview_email_async(display[0], jd_text))]  # type: ignore[attr-defined]
+    tasks += [
+        asyncio.ensure_future(ai.generate_rejection_email_async(d, jd_text))  # type: ignore[attr-defined]
+        for d in display[1:]
+    ]
+    _, pending = await asyncio.wait(tasks, timeout=EMAIL_TIMEOUT)
+    for t in pending:
+        t.cancel()
+
+    def result_or(task: asyncio.Future, fallback: str) -> str:
+        if task.cancelled() or not task.done() or task.exception() is not None:
+            return fallback
+        return task.result()
+
+    # rejections is in candidate order, same as tasks[1:]
+    return result_or(tasks[0], interview), [
+        {"name": r["name"], "email": result_or(t, r["email"])} for r, t in zip(rejections, tasks[1:])
+    ]
+
 # ---------------------- FastAPI app ----------------------
-app = FastAPI(title="Recruitment AI Agent", version="1.0.1")
+# Resume parsing is CPU-bound pure Python, so it goes to processes, not threads.
+# Stays None outside the app lifespan, in which case the default thread pool is used.
+# PARSE_WORKERS sizes it per uvicorn worker; by default the cores are split across
+# the WEB_CONCURRENCY workers so the host doesn't run cpu_count² parser processes.
+_POOL: Optional[ProcessPoolExecutor] = None
+
+# Don't fork a process that already runs an event loop and threads: use forkserver
+# where the platform has it, spawn elsewhere (Windows)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+def _make_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    if max_workers is None:
+        web_workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        max_workers = int(os.getenv("PARSE_WORKERS", max(1, (os.cpu_count() or 1) // web_workers)))
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=_POOL_CONTEXT,
+    )
+
+def _replace_pool(broken: Optional[ProcessPoolExecutor]) -> None:
+    global _POOL
+    if broken is None or _POOL is not broken:  # already replaced by another request
+        return
+    _POOL = _make_pool()
+    broken.shutdown(wait=False, cancel_futures=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _POOL
+    _POOL = _make_pool()
+    try:
+        yield
+    finally:
+        _POOL.shutdown(cancel_futures=True)
+        _POOL = None
+
+app = FastAPI(
+    title="Recruitment AI Agent",
+    version="1.0.1",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+# results.html runs to tens of KB; compress anything over 1 KB when the client accepts gzip.
+# If a reverse proxy also compresses, disable one of the two.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 if os.path.isdir("static"):
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory="templates")
 
+@lru_cache(maxsize=None)
+def _render_static(name: str) -> bytes:
+    """Render a template that uses no context variables, once per process."""
+    return templates.get_template(name).render().encode()
+
+def render_results(request: Request, jd_text: str, candidates: List[dict], interview_email: str, rejection_emails: List[dict]) -> HTMLResponse:
+    # results.html has no Jinja expressions (the page fills itself in client-side),
+    # so every response is the same bytes
+    return HTMLResponse(_render_static("results.html"))
+
 @app.get("/", response_class=HTMLResponse, tags=["UI"])
 def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request, "jd_text": ""})
@@ -198,11 +444,13 @@ def favicon():
 # ---------------------- JD endpoints ----------------------
 @app.post("/generate-jd", tags=["Job Description"])
 async def generate_jd(payload: dict):
-    return JSONResponse({"job_description": generate_job_description(payload or {})})
+    return ORJSONResponse({"job_description": await generate_job_description(payload or {})})
 
 @app.post("/upload-jd", tags=["Job Description"])
 async def upload_jd(file: UploadFile = File(..., description="JD file (PDF/DOC/DOCX)")):
-    return JSONResponse({"job_description": extract_text_from_upload(file)})
+    if (too_large := check_upload_sizes([file])) is not None:
+        return too_large
+    return ORJSONResponse({"job_description": await extract_text_from_upload(file)})
 
 # ---------- Aliases for older/new frontend names ----------
 # /upload-jd-file -> same as /upload-jd, accept "file" or "jd_file"
@@ -213,8 +461,10 @@ async def upload_jd_file(
 ):
     up = file or jd_file
     if not up:
-        return JSONResponse({"detail": "Provide a JD file under field 'file' or 'jd_file'."}, status_code=422)
-    return JSONResponse({"job_description": extract_text_from_upload(up)})
+        return ORJSONResponse({"detail": "Provide a JD file under field 'file' or 'jd_file'."}, status_code=422)
+    if (too_large := check_upload_sizes([up])) is not None:
+        return too_large
+    return ORJSONResponse({"job_description": await extract_text_from_upload(up)})
 
 # ---------------------- Matching endpoints ----------------------
 @app.post("/process-resumes", response_class=HTMLResponse, tags=["Matching"])
@@ -224,23 +474,16 @@ async def process_resumes(
     jd_text: str = Form(..., description="Job Description text"),
 ):
     if len(resumes) > 10:
-        return JSONResponse({"detail": "Please upload at most 10 resumes."}, status_code=422)
+        return ORJSONResponse({"detail": "Please upload at most 10 resumes."}, status_code=422)
+    if (too_large := check_upload_sizes(resumes)) is not None:
+        return too_large
 
-    blobs: List[tuple[str, str]] = []
-    for f in resumes:
-        blobs.append(((f.filename or "candidate"), extract_text_from_upload(f)))
+    texts = await extract_texts_from_uploads(resumes)
+    blobs: List[tuple[str, str]] = [((f.filename or "candidate"), t) for f, t in zip(resumes, texts)]
 
     candidates, interview_email, rejection_emails = score_candidates(jd_text, blobs)
-    ctx = {
-        "request": request,
-        "results": candidates,
-        "candidates": candidates,
-        "interview_email": interview_email,
-        "rejection_emails": rejection_emails,
-        "jd_text": jd_text,
-        "job_description": jd_text,
-    }
-    return templates.TemplateResponse("results.html", ctx)
+    interview_email, rejection_emails = await draft_emails(jd_text, candidates, interview_email, rejection_emails)
+    return render_results(request, jd_text, candidates, interview_email, rejection_emails)
 
 # Alias: /evaluate-candidates -> same behavior as /process-resumes
 @app.post("/evaluate-candidates", response_class=HTMLResponse, tags=["Matching"])
@@ -258,24 +501,19 @@ async def evaluate_candidates(
     jd = (jd_text or job_description or "").strip()
 
     if not jd:
-        return JSONResponse({"detail": "Missing job description (jd_text)."}, status_code=422)
+        return ORJSONResponse({"detail": "Missing job description (jd_text)."}, status_code=422)
     if not all_files:
-        return JSONResponse({"detail": "No resumes uploaded (use field 'resumes' or 'files')."}, status_code=422)
+        return ORJSONResponse({"detail": "No resumes uploaded (use field 'resumes' or 'files')."}, status_code=422)
     if len(all_files) > 10:
-        return JSONResponse({"detail": "Please upload at most 10 resumes."}, status_code=422)
+        return ORJSONResponse({"detail": "Please upload at most 10 resumes."}, status_code=422)
+    if (too_large := check_upload_sizes(all_files)) is not None:
+        return too_large
 
-    blobs = [((f.filename or "candidate"), extract_text_from_upload(f)) for f in all_files]
+    texts = await extract_texts_from_uploads(all_files)
+    blobs = [((f.filename or "candidate"), t) for f, t in zip(all_files, texts)]
     candidates, interview_email, rejection_emails = score_candidates(jd, blobs)
-    ctx = {
-        "request": request,
-        "results": candidates,
-        "candidates": candidates,
-        "interview_email": interview_email,
-        "rejection_emails": rejection_emails,
-        "jd_text": jd,
-        "job_description": jd,
-    }
-    return templates.TemplateResponse("results.html", ctx)
+    interview_email, rejection_emails = await draft_emails(jd, candidates, interview_email, rejection_emails)
+    return render_results(request, jd, candidates, interview_email, rejection_emails)
 
 # Health (optional)
 @app.get("/health", tags=["Ops"])
@@ -82,12 +82,36 @@ def main():
     print("-" * 50)
     
     # Start the server
+    # DEV=1 keeps the auto-reloading single process; otherwise run one worker
+    # per core (WEB_CONCURRENCY overrides). uvloop/httptools ship with
+    # uvicorn[standard] but are optional (e.g. uvloop has no Windows build).
+    dev = os.getenv("DEV") == "1"
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    workers = 1 if dev else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2))
+    # Exported so each worker can size its parser pool to its share of the cores
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+
     try:
         uvicorn.run(
             "main:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
+            reload=dev,
+            workers=workers,
+            loop=loop,
+            http=http,
+            limit_concurrency=1000,
+            timeout_keep_alive=30,
             log_level="info"
         )
     except KeyboardInterrupt:
@@ -1,9 +1,17 @@
 # ai_service.py
 import os
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 _MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-7-sonnet-2025-06-06")
 _client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Async client for calls made from request handlers; its httpx pool keeps
+# TCP/TLS connections alive across calls instead of blocking the event loop.
+# The SDK default timeout is 600s; a results page shouldn't wait that long.
+_aclient = AsyncAnthropic(
+    api_key=os.getenv("ANTHROPIC_API_KEY"),
+    timeout=float(os.getenv("ANTHROPIC_TIMEOUT", "20")),
+    max_retries=2,
+)
 
 def _claude(system: str, user: str, max_tokens: int = 1200, temperature: float = 0.3) -> str:
     msg = _client.messages.create(
@@ -16,7 +24,17 @@ def _claude(system: str, user: str, max_tokens: int = 1200, temperature: float =
     # Concatenate text parts
     return "".join([p.text for p in msg.content if getattr(p, "type", "") == "text"]).strip()
 
-def generate_job_description(payload: dict) -> str:
+async def _claude_async(system: str, user: str, max_tokens: int = 1200, temperature: float = 0.3) -> str:
+    msg = await _aclient.messages.create(
+        model=_MODEL,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        system=system,
+        messages=[{"role": "user", "content": user}],
+    )
+    return "".join([p.text for p in msg.content if getattr(p, "type", "") == "text"]).strip()
+
+def _job_description_prompt(payload: dict) -> tuple[str, str]:
     user = (
         f"Title: {payload.get('title','')}\n"
         f"Years of experience: {payload.get('years_of_experience','')}\n"
@@ -29,21 +47,39 @@ def generate_job_description(payload: dict) -> str:
         "Preferred Qualifications, About the Company, Benefits. Use bullet points. Keep it 250–450 words."
     )
     system = "You are an expert technical recruiter who writes clear, inclusive job descriptions."
-    return _claude(system, user, max_tokens=1600)
+    return system, user
 
-def generate_interview_email(candidate_name: str, jd_text: str) -> str:
+def generate_job_description(payload: dict) -> str:
+    return _claude(*_job_description_prompt(payload), max_tokens=1600)
+
+async def generate_job_description_async(payload: dict) -> str:
+    return await _claude_async(*_job_description_prompt(payload), max_tokens=1600)
+
+def _interview_prompt(candidate_name: str, jd_text: str) -> tuple[str, str]:
     system = "You write short, friendly recruiting emails."
     user = (
         f"Candidate: {candidate_name}\n"
         "Write an interview invitation email (subject + body) based on this JD summary:\n"
         f"{jd_text[:2500]}"
     )
-    return _claude(system, user, max_tokens=600)
+    return system, user
 
-def generate_rejection_email(candidate_name: str, jd_text: str) -> str:
+def _rejection_prompt(candidate_name: str) -> tuple[str, str]:
     system = "You write empathetic, brief rejection emails that keep the door open."
     user = (
         f"Candidate: {candidate_name}\n"
         "Write a polite rejection email (subject + body). Do not include private feedback."
     )
-    return _claude(system, user, max_tokens=400)
+    return system, user
+
+def generate_interview_email(candidate_name: str, jd_text: str) -> str:
+    return _claude(*_interview_prompt(candidate_name, jd_text), max_tokens=600)
+
+def generate_rejection_email(candidate_name: str, jd_text: str) -> str:
+    return _claude(*_rejection_prompt(candidate_name), max_tokens=400)
+
+async def generate_interview_email_async(candidate_name: str, jd_text: str) -> str:
+    return await _claude_async(*_interview_prompt(candidate_name, jd_text), max_tokens=600)
+
+async def generate_rejection_email_async(candidate_name: str, jd_text: str) -> str:
+    return await _claude_async(*_rejection_prompt(candidate_name), max_tokens=400)
@@ -1,6 +1,62 @@
+from functools import lru_cache
+import re
+import string
+
 from models.schemas import CandidateResult
 from services.ai_service import AIService
 
+# Common technical skills to look for
+SKILL_KEYWORDS = (
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust',
+    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring', 'laravel',
+    'html', 'css', 'bootstrap', 'tailwind', 'sass', 'less',
+    'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'sqlite',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
+    'git', 'svn', 'agile', 'scrum', 'devops', 'ci/cd', 'terraform', 'ansible',
+    'machine learning', 'ai', 'data science', 'pandas', 'numpy', 'tensorflow', 'pytorch',
+    'rest api', 'graphql', 'microservices', 'oauth', 'jwt', 'soap',
+    'linux', 'ubuntu', 'centos', 'windows', 'macos',
+    'photoshop', 'illustrator', 'figma', 'sketch', 'adobe xd'
+)
+
+# Boundaries are letters only, so version and plural forms still hit: "Python3",
+# "HTML5/CSS3" and "C++17" end at the digit, and a trailing "s" or "js" is allowed
+# ("REST APIs", "ReactJS"). "go" still does not match inside "good".
+#
+# All-letter keywords are found by tokenizing the text once (every non-letter byte
+# becomes a space) and intersecting the tokens with every accepted spelling
+# (keyword, keyword + "s", keyword + "js"), each mapped back to its keyword.
+_TOKEN_CHARS = frozenset(string.ascii_lowercase)
+_XLATE = bytes(b if chr(b) in _TOKEN_CHARS else 0x20 for b in range(256))
+_SINGLE_SKILLS = {
+    (s + suffix).encode(): s
+    for s in SKILL_KEYWORDS if _TOKEN_CHARS.issuperset(s)
+    for suffix in ('js', 's', '')
+}
+
+# The rest ("machine learning", "node.js", "c++", "c#", ...) share one alternation,
+# longest first, with the same boundaries and suffixes as the token lookup.
+_MULTI_SKILL_RE = re.compile(
+    r'(?<![a-z])('
+    + '|'.join(
+        re.escape(s)
+        for s in sorted(SKILL_KEYWORDS, key=len, reverse=True)
+        if not _TOKEN_CHARS.issuperset(s)
+    )
+    + r')(?:s|js)?(?![a-z])'
+)
+
+@lru_cache(maxsize=256)
+def _match_skills(text: str) -> tuple:
+    """Skills found in text, memoized since the same resume is scored against many JDs"""
+    text_lower = text.lower()
+    tokens = text_lower.encode().translate(_XLATE).split()
+    found = {_SINGLE_SKILLS[t] for t in _SINGLE_SKILLS.keys() & tokens}
+    found.update(m.group(1) for m in _MULTI_SKILL_RE.finditer(text_lower))
+
+    # Preserve the keyword-list order of the original scan
+    return tuple(skill for skill in SKILL_KEYWORDS if skill in found)
+
 class CandidateMatcher:
     """Service for matching candidates to job descriptions"""
     
@@ -23,28 +79,7 @@ class CandidateMatcher:
     def _extract_skills_from_text(self, text: str) -> list:
         """Extract skills from text using keyword matching"""
         
-        # Common technical skills to look for
-        skill_keywords = [
-            'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust',
-            'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring', 'laravel',
-            'html', 'css', 'bootstrap', 'tailwind', 'sass', 'less',
-            'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'sqlite',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
-            'git', 'svn', 'agile', 'scrum', 'devops', 'ci/cd', 'terraform', 'ansible',
-            'machine learning', 'ai', 'data science', 'pandas', 'numpy', 'tensorflow', 'pytorch',
-            'rest api', 'graphql', 'microservices', 'oauth', 'jwt', 'soap',
-            'linux', 'ubuntu', 'centos', 'windows', 'macos',
-            'photoshop', 'illustrator', 'figma', 'sketch', 'adobe xd'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills
+        return list(_match_skills(text))
     
     def _calculate_basic_score(self, resume_skills: list, required_skills: list) -> int:
         """Calculate basic matching score based on skill overlap"""
@@ -1,8 +1,55 @@
 import PyPDF2
 import docx
 from pathlib import Path
+import mmap
 import re
 
+try:
+    import pymupdf  # MuPDF (C) text extraction; PyPDF2 is used when missing
+except ImportError:
+    pymupdf = None
+
+try:
+    import ahocorasick  # pyahocorasick; the compiled patterns below are used when missing
+except ImportError:
+    ahocorasick = None
+
+_MULTI_NL = re.compile(r'\n+')
+_MULTI_WS = re.compile(r'\s+')
+
+# Section header keywords, in priority order (earlier section wins on a tie)
+_SECTION_KEYWORDS = (
+    ('education', ('education', 'qualification')),
+    ('experience', ('experience', 'work', 'employment')),
+    ('skills', ('skill', 'technical', 'competenc')),
+    ('contact', ('contact', 'phone', 'email', 'address')),
+)
+_SECTION_PATTERNS = tuple(
+    (section, re.compile('|'.join(words))) for section, words in _SECTION_KEYWORDS
+)
+
+def _build_section_automaton():
+    """One Aho-Corasick automaton over all keywords, valued (priority, section)"""
+    automaton = ahocorasick.Automaton()
+    for priority, (section, words) in enumerate(_SECTION_KEYWORDS):
+        for word in words:
+            automaton.add_word(word, (priority, section))
+    automaton.make_automaton()
+    return automaton
+
+_SECTION_AUTOMATON = _build_section_automaton() if ahocorasick is not None else None
+
+def _detect_section(line_lower: str):
+    """Return the section a line's header keywords point to, or None"""
+    if _SECTION_AUTOMATON is not None:
+        # Single pass over the line; keep the highest-priority hit
+        hits = [value for _, value in _SECTION_AUTOMATON.iter(line_lower)]
+        return min(hits)[1] if hits else None
+    for section, pattern in _SECTION_PATTERNS:
+        if pattern.search(line_lower):
+            return section
+    return None
+
 class DocumentProcessor:
     """Service for extracting text from various document formats"""
     
@@ -21,10 +68,18 @@ class DocumentProcessor:
         """Extract text from PDF file"""
         text = ""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            if pymupdf is not None:
+                with pymupdf.open(file_path) as doc:
+                    for page in doc:
+                        text += page.get_text("text") + "\n"
+            else:
+                # Map the file so PyPDF2's many small seeks/reads over the xref
+                # table hit the page cache directly instead of making syscalls
+                with open(file_path, 'rb') as file, \
+                        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pdf_reader = PyPDF2.PdfReader(mm)
+                    for page in pdf_reader.pages:
+                        text += page.extract_text() + "\n"
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
         
@@ -45,8 +100,8 @@ class DocumentProcessor:
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         # Remove extra whitespace and normalize line breaks
-        text = re.sub(r'\n+', '\n', text)
-        text = re.sub(r'\s+', ' ', text)
+        text = _MULTI_NL.sub('\n', text)
+        text = _MULTI_WS.sub(' ', text)
         text = text.strip()
         
         return text
@@ -68,14 +123,9 @@ class DocumentProcessor:
             line_lower = line.lower().strip()
             
             # Detect section headers
-            if any(word in line_lower for word in ['education', 'qualification']):
-                current_section = 'education'
-            elif any(word in line_lower for word in ['experience', 'work', 'employment']):
-                current_section = 'experience'
-            elif any(word in line_lower for word in ['skill', 'technical', 'competenc']):
-                current_section = 'skills'
-            elif any(word in line_lower for word in ['contact', 'phone', 'email', 'address']):
-                current_section = 'contact'
+            section = _detect_section(line_lower)
+            if section:
+                current_section = section
             
             # Add content to current section
             if current_section and line.strip():
@@ -0,0 +1,40 @@
+# text_extraction.py
+"""
+Upload parsing run inside the parser process pool.
+
+Kept free of app imports (FastAPI, Jinja, scikit-learn) so pool processes
+only load this module and the parser they actually need.
+"""
+import io
+
+def extract_text_from_bytes(filename: str, content: bytes) -> str:
+    """Extract text from raw upload bytes, choosing the parser by file extension"""
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        try:
+            import pymupdf  # type: ignore  # MuPDF (C) text extraction
+        except ImportError:
+            pymupdf = None
+        try:
+            if pymupdf is not None:
+                with pymupdf.open(stream=content, filetype="pdf") as doc:
+                    return "\n".join(p.get_text("text") for p in doc).strip()
+            from PyPDF2 import PdfReader  # type: ignore
+            reader = PdfReader(io.BytesIO(content))
+            parts = [(p.extract_text() or "") for p in reader.pages]
+            return "\n".join(parts).strip()
+        except Exception:
+            return ""
+    if name.endswith(".docx"):
+        try:
+            import docx  # python-docx
+            doc = docx.Document(io.BytesIO(content))
+            return "\n".join(p.text for p in doc.paragraphs).strip()
+        except Exception:
+            return ""
+    if name.endswith(".txt"):
+        try:
+            return content.decode("utf-8", errors="ignore")
+        except Exception:
+            return ""
+    return content.decode("utf-8", errors="ignore")